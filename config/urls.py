@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.urls import include, path
 from django.conf import settings
 from django.conf.urls.static import static
+from django.views.decorators.cache import cache_page
 from drf_spectacular.views import (
     SpectacularAPIView,
     SpectacularSwaggerView,
@@ -13,7 +14,11 @@ urlpatterns = (
         path("admin/", admin.site.urls),
         path("api/theatre/", include("theatre.urls", namespace="theatre")),
         path("api/user/", include("user.urls", namespace="user")),
-        path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
+        path(
+            "api/schema/",
+            cache_page(60 * 60 * 24)(SpectacularAPIView.as_view()),
+            name="schema",
+        ),
         path(
             "api/doc/swagger/",
             SpectacularSwaggerView.as_view(url_name="schema"),
@@ -14,7 +14,22 @@ from theatre.models import (
 admin.site.register(Actor)
 admin.site.register(Genre)
 admin.site.register(Play)
-admin.site.register(Performance)
 admin.site.register(TheatreHall)
-admin.site.register(Ticket)
-admin.site.register(Reservation)
+
+
+@admin.register(Performance)
+class PerformanceAdmin(admin.ModelAdmin):
+    list_select_related = ("play",)
+
+
+@admin.register(Ticket)
+class TicketAdmin(admin.ModelAdmin):
+    list_select_related = ("performance__play",)
+    show_full_result_count = False
+
+
+@admin.register(Reservation)
+class ReservationAdmin(admin.ModelAdmin):
+    list_display = ("__str__", "user")
+    list_select_related = ("user",)
+    show_full_result_count = False
@@ -0,0 +1,40 @@
+import uuid
+from hashlib import md5
+from typing import Iterable
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Model
+
+
+def get_model_cache_version_key(model: type[Model]) -> str:
+    return f"theatre:{model._meta.model_name}:version"
+
+
+def get_model_cache_versions(models: Iterable[type[Model]]) -> list[str]:
+    keys = [get_model_cache_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+
+    if missing_versions := {
+        key: uuid.uuid4().hex for key in keys if key not in versions
+    }:
+        cache.set_many(missing_versions, None)
+        versions.update(missing_versions)
+
+    return [versions[key] for key in keys]
+
+
+def get_list_cache_key(
+    name: str, models: Iterable[type[Model]], url: str
+) -> str:
+    url_hash = md5(url.encode()).hexdigest()
+    return ":".join(
+        ("theatre", name, "list", *get_model_cache_versions(models), url_hash)
+    )
+
+
+def invalidate_model_cache(model: type[Model]) -> None:
+    # wait for the commit, otherwise a request running in between could
+    # cache pre-commit data under the new version
+    version_key = get_model_cache_version_key(model)
+    transaction.on_commit(lambda: cache.delete(version_key))
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.6 on 2026-10-15 10:00
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("theatre", "0003_play_image"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="performance",
+            index=models.Index(
+                fields=["-show_time"], name="theatre_per_show_ti_ae5b94_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="performance",
+            index=models.Index(
+                fields=["play", "show_time"],
+                name="theatre_per_play_id_1e3e93_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="performance",
+            index=models.Index(
+                fields=["theatre_hall", "show_time"],
+                name="theatre_per_theatre_2b9613_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="play",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("title"),
+                    name="gin_trgm_ops",
+                ),
+                name="theatre_play_title_trgm_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.6 on 2026-10-15 11:00
+
+from django.db import migrations, models
+
+
+def populate_tickets_taken(apps, schema_editor):
+    Performance = apps.get_model("theatre", "Performance")
+
+    for performance in Performance.objects.annotate(
+        tickets_count=models.Count("tickets")
+    ).filter(tickets_count__gt=0):
+        performance.tickets_taken = performance.tickets_count
+        performance.save(update_fields=["tickets_taken"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("theatre", "0004_performance_play_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="performance",
+            name="tickets_taken",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(
+            populate_tickets_taken, migrations.RunPython.noop
+        ),
+    ]
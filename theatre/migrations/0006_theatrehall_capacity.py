@@ -0,0 +1,26 @@
+# Generated by Django 4.2.6 on 2026-10-15 12:00
+
+from django.db import migrations, models
+
+
+def populate_capacity(apps, schema_editor):
+    TheatreHall = apps.get_model("theatre", "TheatreHall")
+    TheatreHall.objects.update(
+        capacity=models.F("rows") * models.F("seats_in_row")
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("theatre", "0005_performance_tickets_taken"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="theatrehall",
+            name="capacity",
+            field=models.PositiveIntegerField(default=0, editable=False),
+            preserve_default=False,
+        ),
+        migrations.RunPython(populate_capacity, migrations.RunPython.noop),
+    ]
@@ -1,16 +1,28 @@
 import os
 import uuid
+from functools import lru_cache
 
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Upper
 from django.conf import settings
 from django.utils.text import slugify
 
+from theatre.cache import invalidate_model_cache
+
 
 class TheatreHall(models.Model):
     name = models.CharField(max_length=63, unique=True)
     rows = models.PositiveIntegerField()
     seats_in_row = models.PositiveIntegerField()
+    capacity = models.PositiveIntegerField(editable=False)
+
+    def save(self, *args, **kwargs) -> None:
+        self.capacity = self.rows * self.seats_in_row
+        if (update_fields := kwargs.get("update_fields")) is not None:
+            kwargs["update_fields"] = {*update_fields, "capacity"}
+        return super().save(*args, **kwargs)
 
     class Meta:
         ordering = ("name",)
@@ -56,7 +68,12 @@ class Reservation(models.Model):
         ordering = ("-created_at",)
 
     def __str__(self) -> str:
-        return self.created_at
+        return self.created_at.isoformat()
+
+
+@lru_cache(maxsize=1024)
+def _slugify_title(title: str) -> str:
+    return slugify(title)
 
 
 def get_play_image_path(instance: "Play", filename: str) -> str:
@@ -65,7 +82,7 @@ def get_play_image_path(instance: "Play", filename: str) -> str:
     return os.path.join(
         "uploads",
         "plays",
-        f"{slugify(instance.title)}-{uuid.uuid4()}{ext}",
+        f"{_slugify_title(instance.title)}-{uuid.uuid4()}{ext}",
     )
 
 
@@ -82,6 +99,12 @@ class Play(models.Model):
 
     class Meta:
         ordering = ("title",)
+        indexes = [
+            GinIndex(
+                OpClass(Upper("title"), name="gin_trgm_ops"),
+                name="theatre_play_title_trgm_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.title
@@ -95,9 +118,40 @@ class Performance(models.Model):
         TheatreHall, related_name="performances", on_delete=models.CASCADE
     )
     show_time = models.DateTimeField()
+    tickets_taken = models.PositiveIntegerField(default=0, editable=False)
+
+    @classmethod
+    def add_tickets_taken(cls, performance_id: int, count: int) -> None:
+        cls.objects.filter(pk=performance_id).update(
+            tickets_taken=models.F("tickets_taken") + count
+        )
+        invalidate_model_cache(cls)
+
+    def save(self, *args, **kwargs) -> None:
+        # tickets_taken is only changed through add_tickets_taken; writing
+        # back the in-memory value would undo bookings made since loading
+        if not self._state.adding:
+            update_fields = kwargs.get("update_fields")
+            if update_fields is None:
+                update_fields = [
+                    field.name
+                    for field in self._meta.concrete_fields
+                    if not field.primary_key
+                ]
+            kwargs["update_fields"] = [
+                field_name
+                for field_name in update_fields
+                if field_name != "tickets_taken"
+            ]
+        return super().save(*args, **kwargs)
 
     class Meta:
         ordering = ("-show_time",)
+        indexes = [
+            models.Index(fields=["-show_time"]),
+            models.Index(fields=["play", "show_time"]),
+            models.Index(fields=["theatre_hall", "show_time"]),
+        ]
 
     def __str__(self) -> str:
         return f"{self.play.title} ({self.show_time})"
@@ -120,25 +174,20 @@ class Ticket(models.Model):
         theatre_hall: TheatreHall,
         exc_to_raise: type[Exception],
     ) -> None:
-        for attr_name, attr_value, theatre_hall_attr_name in (
-            ("row", row, "rows"),
-            ("seat", seat, "seats_in_row"),
-        ):
-            max_value = getattr(theatre_hall, theatre_hall_attr_name)
-            if not attr_value <= max_value:
-                raise exc_to_raise(
-                    f"{attr_name} must be in range [1, {max_value}]"
-                )
+        if not 1 <= row <= theatre_hall.rows:
+            raise exc_to_raise(
+                f"row must be in range [1, {theatre_hall.rows}]"
+            )
+        if not 1 <= seat <= theatre_hall.seats_in_row:
+            raise exc_to_raise(
+                f"seat must be in range [1, {theatre_hall.seats_in_row}]"
+            )
 
     def clean(self) -> None:
         self.validate_ticket(
             self.row, self.seat, self.performance.theatre_hall, ValidationError
         )
 
-    def save(self, *args, **kwargs) -> None:
-        self.full_clean()
-        return super().save(*args, **kwargs)
-
     class Meta:
         unique_together = ("performance", "row", "seat")
         ordering = ("row", "seat")
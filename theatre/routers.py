@@ -1,10 +1,15 @@
-from rest_framework.routers import DefaultRouter
+from django.urls import re_path
+from rest_framework.routers import SimpleRouter
 
 from theatre.views import APIRootView
 
 
-class Router(DefaultRouter):
-    include_format_suffixes = False 
+class Router(SimpleRouter):
+    root_view_name = "api-root"
 
-    def get_api_root_view(self, api_urls):
-        return APIRootView.as_view()
+    def get_urls(self) -> list:
+        urls = super().get_urls()
+        urls.insert(
+            0, re_path(r"^$", APIRootView.as_view(), name=self.root_view_name)
+        )
+        return urls
@@ -1,6 +1,15 @@
+from collections import Counter
 from typing import Any
 
 from django.db import transaction
+from django.db.models import (
+    F,
+    Prefetch,
+    QuerySet,
+    TextField,
+    Value,
+)
+from django.db.models.functions import Concat, Substr
 from rest_framework import serializers
 
 from theatre.models import (
@@ -32,10 +41,11 @@ class PlaySerializer(serializers.ModelSerializer):
         fields = ("id", "title", "description", "actors", "genres")
 
 
+AVAILABLE_TICKETS = F("theatre_hall__capacity") - F("tickets_taken")
+
+
 class PlayListSerializer(serializers.ModelSerializer):
-    description = serializers.CharField(
-        source="description_preview", read_only=True
-    )
+    description = serializers.SerializerMethodField()
     actors = serializers.SlugRelatedField(
         many=True, read_only=True, slug_field="full_name"
     )
@@ -43,10 +53,45 @@ class PlayListSerializer(serializers.ModelSerializer):
         many=True, read_only=True, slug_field="name"
     )
 
+    prefetch_related_lookups = ("actors", "genres")
+
     class Meta:
         model = Play
         fields = ("id", "title", "description", "actors", "genres", "image")
 
+    @classmethod
+    def setup_eager_loading(cls, queryset: QuerySet[Play]) -> QuerySet[Play]:
+        return (
+            queryset.prefetch_related(*cls.prefetch_related_lookups)
+            .only("id", "title", "image")
+            .annotate(
+                description_short=Concat(
+                    Substr("description", 1, 80),
+                    Value("..."),
+                    output_field=TextField(),
+                )
+            )
+        )
+
+    def get_description(self, play: Play) -> str:
+        if hasattr(play, "description_short"):
+            return play.description_short
+        return play.description_preview
+
+    def to_representation(self, play: Play) -> dict[str, Any]:
+        return {
+            "id": play.id,
+            "title": play.title,
+            "description": self.get_description(play),
+            "actors": [actor.full_name for actor in play.actors.all()],
+            "genres": [genre.name for genre in play.genres.all()],
+            "image": (
+                self.fields["image"].to_representation(play.image)
+                if play.image
+                else None
+            ),
+        }
+
 
 class PlayDetailSerializer(serializers.ModelSerializer):
     actors = ActorSerializer(many=True, read_only=True)
@@ -56,6 +101,10 @@ class PlayDetailSerializer(serializers.ModelSerializer):
         model = Play
         fields = ("id", "title", "description", "actors", "genres", "image")
 
+    @classmethod
+    def setup_eager_loading(cls, queryset: QuerySet[Play]) -> QuerySet[Play]:
+        return queryset.prefetch_related("actors", "genres")
+
 
 class PlayImageSerializer(serializers.ModelSerializer):
     class Meta:
@@ -75,6 +124,20 @@ class PerformanceSerializer(serializers.ModelSerializer):
         fields = ("id", "play", "theatre_hall", "show_time")
 
 
+def get_performance_list_data(
+    performance: dict[str, Any], show_time_field: serializers.DateTimeField
+) -> dict[str, Any]:
+    return {
+        "id": performance["id"],
+        "play_title": performance["play_title"],
+        "theatre_hall_name": performance["theatre_hall_name"],
+        "show_time": show_time_field.to_representation(
+            performance["show_time"]
+        ),
+        "available_tickets": performance["available_tickets"],
+    }
+
+
 class PerformanceListSerializer(serializers.ModelSerializer):
     play_title = serializers.CharField(source="play.title", read_only=True)
     theatre_hall_name = serializers.CharField(
@@ -92,6 +155,62 @@ class PerformanceListSerializer(serializers.ModelSerializer):
             "available_tickets",
         )
 
+    @classmethod
+    def setup_eager_loading(
+        cls, queryset: QuerySet[Performance]
+    ) -> QuerySet[Performance]:
+        return (
+            queryset.select_related("play", "theatre_hall")
+            .only(
+                "id",
+                "show_time",
+                "tickets_taken",
+                "play",
+                "play__title",
+                "theatre_hall",
+                "theatre_hall__name",
+                "theatre_hall__capacity",
+            )
+            .annotate(available_tickets=AVAILABLE_TICKETS)
+        )
+
+    def to_representation(self, performance: Performance) -> dict[str, Any]:
+        return get_performance_list_data(
+            {
+                "id": performance.id,
+                "play_title": performance.play.title,
+                "theatre_hall_name": performance.theatre_hall.name,
+                "show_time": performance.show_time,
+                "available_tickets": performance.available_tickets,
+            },
+            self.fields["show_time"],
+        )
+
+
+class PerformanceListValuesSerializer(serializers.Serializer):
+    id = serializers.IntegerField(read_only=True)  # noqa: VNE003
+    play_title = serializers.CharField(read_only=True)
+    theatre_hall_name = serializers.CharField(read_only=True)
+    show_time = serializers.DateTimeField(read_only=True)
+    available_tickets = serializers.IntegerField(read_only=True)
+
+    @classmethod
+    def setup_eager_loading(
+        cls, queryset: QuerySet[Performance]
+    ) -> QuerySet[dict[str, Any]]:
+        return queryset.values(
+            "id",
+            "show_time",
+            play_title=F("play__title"),
+            theatre_hall_name=F("theatre_hall__name"),
+            available_tickets=AVAILABLE_TICKETS,
+        )
+
+    def to_representation(self, performance: dict[str, Any]) -> dict[str, Any]:
+        return get_performance_list_data(
+            performance, self.fields["show_time"]
+        )
+
 
 class TicketSeatsSerializer(serializers.ModelSerializer):
     class Meta:
@@ -100,7 +219,9 @@ class TicketSeatsSerializer(serializers.ModelSerializer):
 
 
 class PerformanceDetailSerializer(serializers.ModelSerializer):
-    play = PlayListSerializer()
+    # PlayListSerializer builds its dict directly in to_representation,
+    # so nesting it adds no per-field dispatch
+    play = PlayListSerializer(read_only=True)
     theatre_hall = TheatreHallSerializer()
     taken_places = TicketSeatsSerializer(source="tickets", many=True)
 
@@ -108,11 +229,33 @@ class PerformanceDetailSerializer(serializers.ModelSerializer):
         model = Performance
         fields = ("id", "play", "theatre_hall", "show_time", "taken_places")
 
+    @classmethod
+    def setup_eager_loading(
+        cls, queryset: QuerySet[Performance]
+    ) -> QuerySet[Performance]:
+        return queryset.select_related(
+            "play", "theatre_hall"
+        ).prefetch_related(
+            "play__actors",
+            "play__genres",
+            Prefetch(
+                "tickets",
+                queryset=Ticket.objects.only("row", "seat", "performance_id"),
+            ),
+        )
+
 
 class TicketSerializer(serializers.ModelSerializer):
+    performance = serializers.PrimaryKeyRelatedField(
+        queryset=Performance.objects.select_related("theatre_hall")
+    )
+
     class Meta:
         model = Ticket
         fields = ("id", "row", "seat", "performance")
+        # uniqueness is checked for all tickets at once by
+        # ReservationSerializer.validate_tickets
+        validators = []
 
     def validate(self, attrs: Any) -> Any:
         data = super().validate(attrs)
@@ -132,6 +275,16 @@ class TicketListSerializer(serializers.ModelSerializer):
         model = Ticket
         fields = ("id", "row", "seat", "performance")
 
+    def to_representation(self, ticket: Ticket) -> dict[str, Any]:
+        return {
+            "id": ticket.id,
+            "row": ticket.row,
+            "seat": ticket.seat,
+            "performance": self.fields["performance"].to_representation(
+                ticket.performance
+            ),
+        }
+
 
 class ReservationSerializer(serializers.ModelSerializer):
     tickets = TicketSerializer(many=True, allow_empty=False)
@@ -140,13 +293,52 @@ class ReservationSerializer(serializers.ModelSerializer):
         model = Reservation
         fields = ("id", "created_at", "tickets")
 
+    def validate_tickets(self, tickets: Any) -> Any:
+        places = [
+            (ticket["performance"].id, ticket["row"], ticket["seat"])
+            for ticket in tickets
+        ]
+        if len(set(places)) != len(places):
+            raise serializers.ValidationError(
+                "The same place cannot be reserved twice"
+            )
+
+        performance_ids, rows, seats = (set(values) for values in zip(*places))
+        taken_places = set(places).intersection(
+            Ticket.objects.filter(
+                performance_id__in=performance_ids,
+                row__in=rows,
+                seat__in=seats,
+            ).values_list("performance_id", "row", "seat")
+        )
+        if taken_places:
+            raise serializers.ValidationError(
+                [
+                    f"Place (row: {row}, seat: {seat}) is already taken "
+                    f"for performance {performance_id}"
+                    for performance_id, row, seat in sorted(taken_places)
+                ]
+            )
+
+        return tickets
+
     def create(self, validated_data: Any) -> Reservation:
         with transaction.atomic():
             tickets_data = validated_data.pop("tickets")
             reservation = super().create(validated_data)
 
-            for ticket_data in tickets_data:
-                Ticket.objects.create(reservation=reservation, **ticket_data)
+            Ticket.objects.bulk_create(
+                [
+                    Ticket(reservation=reservation, **ticket_data)
+                    for ticket_data in tickets_data
+                ],
+                batch_size=1000,
+            )
+
+            for performance, count in Counter(
+                ticket_data["performance"] for ticket_data in tickets_data
+            ).items():
+                Performance.add_tickets_taken(performance.id, count)
 
             return reservation
 
@@ -157,3 +349,36 @@ class ReservationListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Reservation
         fields = ("id", "created_at", "tickets")
+
+    @classmethod
+    def setup_eager_loading(
+        cls, queryset: QuerySet[Reservation]
+    ) -> QuerySet[Reservation]:
+        return queryset.prefetch_related(
+            Prefetch(
+                "tickets",
+                queryset=Ticket.objects.only(
+                    "id", "row", "seat", "performance_id", "reservation_id"
+                ),
+                to_attr="prefetched_tickets",
+            ),
+            Prefetch(
+                "prefetched_tickets__performance",
+                queryset=PerformanceListSerializer.setup_eager_loading(
+                    Performance.objects.all()
+                ),
+            ),
+        )
+
+    def to_representation(self, reservation: Reservation) -> dict[str, Any]:
+        tickets = getattr(reservation, "prefetched_tickets", None)
+        if tickets is None:
+            tickets = reservation.tickets.all()
+
+        return {
+            "id": reservation.id,
+            "created_at": self.fields["created_at"].to_representation(
+                reservation.created_at
+            ),
+            "tickets": self.fields["tickets"].to_representation(tickets),
+        }
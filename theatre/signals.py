@@ -0,0 +1,71 @@
+from django.db.models import Model
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from theatre.cache import invalidate_model_cache
+from theatre.models import (
+    Actor,
+    Genre,
+    Performance,
+    Play,
+    TheatreHall,
+    Ticket,
+)
+
+
+@receiver(post_save, sender=Actor)
+@receiver(post_delete, sender=Actor)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=TheatreHall)
+@receiver(post_delete, sender=TheatreHall)
+@receiver(post_save, sender=Play)
+@receiver(post_delete, sender=Play)
+@receiver(post_save, sender=Performance)
+@receiver(post_delete, sender=Performance)
+def invalidate_list_cache(sender: type[Model], **kwargs) -> None:
+    invalidate_model_cache(sender)
+
+
+@receiver(m2m_changed, sender=Play.actors.through)
+@receiver(m2m_changed, sender=Play.genres.through)
+def invalidate_play_list_cache(sender: type[Model], **kwargs) -> None:
+    invalidate_model_cache(Play)
+
+
+@receiver(pre_save, sender=Ticket)
+def remember_ticket_performance(
+    sender: type[Ticket], instance: Ticket, **kwargs
+) -> None:
+    instance._previous_performance_id = (
+        Ticket.objects.filter(pk=instance.pk)
+        .values_list("performance_id", flat=True)
+        .first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=Ticket)
+def update_tickets_taken_on_save(
+    sender: type[Ticket], instance: Ticket, **kwargs
+) -> None:
+    previous_performance_id = instance._previous_performance_id
+    if previous_performance_id == instance.performance_id:
+        return
+
+    if previous_performance_id is not None:
+        Performance.add_tickets_taken(previous_performance_id, -1)
+    Performance.add_tickets_taken(instance.performance_id, 1)
+
+
+@receiver(post_delete, sender=Ticket)
+def update_tickets_taken_on_delete(
+    sender: type[Ticket], instance: Ticket, **kwargs
+) -> None:
+    Performance.add_tickets_taken(instance.performance_id, -1)
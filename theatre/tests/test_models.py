@@ -0,0 +1,102 @@
+from django.test import TestCase
+from rest_framework_simplejwt.authentication import get_user_model
+
+from theatre.models import Performance, Reservation, Ticket
+from theatre.serializers import PerformanceSerializer
+from theatre.tests.test_views import (
+    sample_performance,
+    sample_play,
+    sample_theatre_hall,
+)
+
+
+class PerformanceTicketsTakenTests(TestCase):
+    def setUp(self) -> None:
+        sample_play()
+        sample_theatre_hall()
+        self.performance = sample_performance(play_id=1, theatre_hall_id=1)
+        self.another_performance = sample_performance(
+            play_id=1, theatre_hall_id=1
+        )
+        user = get_user_model().objects.create_user(
+            email="user@user.com", password="test_password"
+        )
+        self.reservation = Reservation.objects.create(user=user)
+
+    def sample_ticket(self, **params) -> Ticket:
+        defaults = {
+            "row": 1,
+            "seat": 1,
+            "performance": self.performance,
+            "reservation": self.reservation,
+        }
+        defaults.update(params)
+
+        return Ticket.objects.create(**defaults)
+
+    def assert_tickets_taken(
+        self, performance: Performance, count: int
+    ) -> None:
+        performance.refresh_from_db()
+        self.assertEqual(performance.tickets_taken, count)
+
+    def test_ticket_create_increments_tickets_taken(self) -> None:
+        self.sample_ticket(seat=1)
+        self.sample_ticket(seat=2)
+
+        self.assert_tickets_taken(self.performance, 2)
+
+    def test_ticket_delete_decrements_tickets_taken(self) -> None:
+        ticket = self.sample_ticket(seat=1)
+        self.sample_ticket(seat=2)
+
+        ticket.delete()
+
+        self.assert_tickets_taken(self.performance, 1)
+
+    def test_reservation_delete_decrements_tickets_taken(self) -> None:
+        self.sample_ticket(seat=1)
+        self.sample_ticket(seat=2)
+
+        self.reservation.delete()
+
+        self.assert_tickets_taken(self.performance, 0)
+
+    def test_ticket_move_updates_both_performances(self) -> None:
+        ticket = self.sample_ticket()
+
+        ticket.performance = self.another_performance
+        ticket.save()
+
+        self.assert_tickets_taken(self.performance, 0)
+        self.assert_tickets_taken(self.another_performance, 1)
+
+    def test_ticket_update_keeps_tickets_taken(self) -> None:
+        ticket = self.sample_ticket(seat=1)
+
+        ticket.seat = 2
+        ticket.save()
+
+        self.assert_tickets_taken(self.performance, 1)
+
+    def test_performance_save_keeps_tickets_taken(self) -> None:
+        performance = Performance.objects.get(pk=self.performance.pk)
+        self.sample_ticket()
+
+        performance.save()
+
+        self.assert_tickets_taken(self.performance, 1)
+
+    def test_performance_serializer_update_keeps_tickets_taken(self) -> None:
+        performance = Performance.objects.get(pk=self.performance.pk)
+        self.sample_ticket()
+
+        serializer = PerformanceSerializer(
+            performance,
+            data={"show_time": "2023-02-02T00:00:00Z"},
+            partial=True,
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        self.assert_tickets_taken(self.performance, 1)
@@ -1,7 +1,8 @@
+import json
 import random
 import string
 
-from django.db.models import F, Count
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework.generics import get_object_or_404
@@ -13,6 +14,7 @@ from theatre.models import Genre, Actor, Performance, Play, TheatreHall
 from theatre.serializers import (
     PerformanceDetailSerializer,
     PerformanceListSerializer,
+    PerformanceListValuesSerializer,
     PerformanceSerializer,
     PlayDetailSerializer,
     PlayListSerializer,
@@ -20,8 +22,10 @@ from theatre.serializers import (
 )
 
 
+ACTOR_URL = reverse("theatre:actor-list")
 PLAY_URL = reverse("theatre:play-list")
 PERFORMANCE_URL = reverse("theatre:performance-list")
+RESERVATION_URL = reverse("theatre:reservation-list")
 
 
 def play_detail_url(pk: int) -> str:
@@ -86,6 +90,7 @@ def sample_performance(
 
 class UnauthenticatedPlayViewSetTests(TestCase):
     def setUp(self) -> None:
+        cache.clear()
         self.client = APIClient()
 
     def test_play_list_is_allowed(self) -> None:
@@ -101,6 +106,7 @@ class UnauthenticatedPlayViewSetTests(TestCase):
 
 class AuthenticatedPlayViewSetTests(TestCase):
     def setUp(self) -> None:
+        cache.clear()
         self.client = APIClient()
         user = get_user_model().objects.create_user(
             email="user@user.com", password="test_password"
@@ -145,6 +151,49 @@ class AuthenticatedPlayViewSetTests(TestCase):
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
         self.assertEqual(resp.data, serializer.data)
 
+    def test_play_list_cache_is_invalidated_on_m2m_change(self) -> None:
+        play = sample_play()
+        genre = sample_genre()
+        self.client.get(PLAY_URL)
+        with self.captureOnCommitCallbacks(execute=True):
+            play.genres.add(genre)
+
+        resp = self.client.get(PLAY_URL)
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data[0]["genres"], [genre.name])
+
+    def test_play_list_queryset_loads_serialized_fields(self) -> None:
+        play = sample_play()
+        play.genres.add(sample_genre())
+        play.actors.add(sample_actor())
+
+        plays = list(
+            PlayListSerializer.setup_eager_loading(Play.objects.all())
+        )
+
+        with self.assertNumQueries(0):
+            PlayListSerializer(plays, many=True).data
+
+    def test_play_list_stream(self) -> None:
+        for _ in range(3):
+            sample_genre()
+            sample_actor()
+
+        for _ in range(5):
+            play = sample_play()
+            play.genres.set([1, 2, 3])
+            play.actors.set([1, 2, 3])
+
+        resp = self.client.get(PLAY_URL, {"stream": 1})
+        with self.assertNumQueries(3):
+            content = b"".join(resp.streaming_content)
+        plays = Play.objects.all()
+        serializer = PlayListSerializer(plays, many=True)
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(content), serializer.data)
+
     def test_play_list_filter_by_title(self) -> None:
         sample_play(title="test")
         sample_play(title="another_test")
@@ -187,6 +236,18 @@ class AuthenticatedPlayViewSetTests(TestCase):
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
         self.assertEqual(resp.data, serializer.data)
 
+    def test_play_list_filter_ignores_malformed_ids(self) -> None:
+        for _ in range(3):
+            sample_actor()
+
+        sample_play().actors.set([1])
+        sample_play().actors.set([3])
+
+        resp = self.client.get(PLAY_URL, {"actors": "-3,1.5,1 2"})
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data, [])
+
     def test_play_retrieve_is_allowed(self) -> None:
         for _ in range(3):
             sample_genre()
@@ -206,6 +267,7 @@ class AuthenticatedPlayViewSetTests(TestCase):
 
 class AdminPlayViewSetTests(TestCase):
     def setUp(self) -> None:
+        cache.clear()
         self.client = APIClient()
         admin = get_user_model().objects.create_superuser(
             email="admin@admin.com", password="test_password"
@@ -288,6 +350,7 @@ class AdminPlayViewSetTests(TestCase):
 
 class UnauthenticatedPerformanceViewSetTests(TestCase):
     def setUp(self) -> None:
+        cache.clear()
         self.client = APIClient()
 
     def test_performance_list_is_allowed(self) -> None:
@@ -303,6 +366,7 @@ class UnauthenticatedPerformanceViewSetTests(TestCase):
 
 class AuthenticatedPerformanceViewSetTests(TestCase):
     def setUp(self) -> None:
+        cache.clear()
         self.client = APIClient()
         user = get_user_model().objects.create_user(
             email="user@user.com", password="test_password"
@@ -322,21 +386,60 @@ class AuthenticatedPerformanceViewSetTests(TestCase):
     def test_performance_list(self) -> None:
         sample_play()
         sample_theatre_hall()
-        for _ in range(3):
-            sample_performance(play_id=1, theatre_hall_id=1)
+        for day in range(1, 4):
+            sample_performance(
+                play_id=1,
+                theatre_hall_id=1,
+                show_time=f"2023-01-0{day}T13:00:00Z",
+            )
 
         resp = self.client.get(PERFORMANCE_URL)
-        performances = Performance.objects.annotate(
-            available_tickets=F("theatre_hall__rows")
-            * F("theatre_hall__seats_in_row")
-            - Count("tickets")
+        performances = PerformanceListValuesSerializer.setup_eager_loading(
+            Performance.objects.all()
         )
 
-        serializer = PerformanceListSerializer(performances, many=True)
+        serializer = PerformanceListValuesSerializer(performances, many=True)
 
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
         self.assertEqual(resp.data, serializer.data)
 
+    def test_performance_list_stream(self) -> None:
+        sample_play()
+        sample_theatre_hall()
+        for day in range(1, 4):
+            sample_performance(
+                play_id=1,
+                theatre_hall_id=1,
+                show_time=f"2023-01-0{day}T13:00:00Z",
+            )
+
+        resp = self.client.get(PERFORMANCE_URL, {"stream": 1})
+        performances = PerformanceListValuesSerializer.setup_eager_loading(
+            Performance.objects.all()
+        )
+        serializer = PerformanceListValuesSerializer(performances, many=True)
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            json.loads(b"".join(resp.streaming_content)), serializer.data
+        )
+
+    def test_performance_list_queryset_loads_serialized_fields(
+        self,
+    ) -> None:
+        sample_play()
+        sample_theatre_hall()
+        sample_performance(play_id=1, theatre_hall_id=1)
+
+        performances = list(
+            PerformanceListSerializer.setup_eager_loading(
+                Performance.objects.all()
+            )
+        )
+
+        with self.assertNumQueries(0):
+            PerformanceListSerializer(performances, many=True).data
+
     def test_performance_list_with_filters(self) -> None:
         sample_theatre_hall()
         for _ in range(2):
@@ -347,16 +450,10 @@ class AuthenticatedPerformanceViewSetTests(TestCase):
         resp = self.client.get(
             PERFORMANCE_URL, {"date": "2023-01-01", "play": 1}
         )
-        performances = (
+        performances = PerformanceListValuesSerializer.setup_eager_loading(
             Performance.objects.filter(show_time__date="2023-01-01", play_id=1)
-            .annotate(
-                available_tickets=F("theatre_hall__rows")
-                * F("theatre_hall__seats_in_row")
-                - Count("tickets")
-            )
-            .distinct()
         )
-        serializer = PerformanceListSerializer(performances, many=True)
+        serializer = PerformanceListValuesSerializer(performances, many=True)
 
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
         self.assertEqual(resp.data, serializer.data)
@@ -373,9 +470,31 @@ class AuthenticatedPerformanceViewSetTests(TestCase):
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
         self.assertEqual(resp.data, serializer.data)
 
+    def test_performance_list_available_tickets_after_reservation(
+        self,
+    ) -> None:
+        sample_play()
+        sample_theatre_hall(rows=10, seats_in_row=15)
+        sample_performance(play_id=1, theatre_hall_id=1)
+        data = {
+            "tickets": [
+                {"row": 1, "seat": 1, "performance": 1},
+                {"row": 1, "seat": 2, "performance": 1},
+            ]
+        }
+
+        self.client.get(PERFORMANCE_URL)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(RESERVATION_URL, data=data, format="json")
+        resp = self.client.get(PERFORMANCE_URL)
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data[0]["available_tickets"], 148)
+
 
 class AdminPerformanceViewSetTests(TestCase):
     def setUp(self) -> None:
+        cache.clear()
         self.client = APIClient()
         admin = get_user_model().objects.create_superuser(
             email="admin@admin.com", password="test_password"
@@ -436,3 +555,140 @@ class AdminPerformanceViewSetTests(TestCase):
         self.assertFalse(
             Performance.objects.filter(id=performance.pk).exists()
         )
+
+
+class AdminActorViewSetCacheTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        admin = get_user_model().objects.create_superuser(
+            email="admin@admin.com", password="test_password"
+        )
+        self.client.force_authenticate(admin)
+
+    def test_actor_list_is_cached(self) -> None:
+        sample_actor()
+        self.client.get(ACTOR_URL)
+
+        with self.assertNumQueries(0):
+            resp = self.client.get(ACTOR_URL)
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(resp.data), 1)
+
+    def test_actor_list_cache_is_invalidated_on_save(self) -> None:
+        sample_actor()
+        self.client.get(ACTOR_URL)
+        with self.captureOnCommitCallbacks(execute=True):
+            sample_actor()
+
+        resp = self.client.get(ACTOR_URL)
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(resp.data), 2)
+
+    def test_actor_list_cache_is_invalidated_on_delete(self) -> None:
+        actor = sample_actor()
+        self.client.get(ACTOR_URL)
+        with self.captureOnCommitCallbacks(execute=True):
+            actor.delete()
+
+        resp = self.client.get(ACTOR_URL)
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(resp.data), 0)
+
+    def test_actor_list_cache_is_invalidated_after_commit(self) -> None:
+        sample_actor()
+        self.client.get(ACTOR_URL)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            sample_actor()
+            resp = self.client.get(ACTOR_URL)
+
+        self.assertEqual(len(resp.data), 1)
+
+        for callback in callbacks:
+            callback()
+        resp = self.client.get(ACTOR_URL)
+
+        self.assertEqual(len(resp.data), 2)
+
+
+class AuthenticatedReservationViewSetTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        user = get_user_model().objects.create_user(
+            email="user@user.com", password="test_password"
+        )
+        self.client.force_authenticate(user)
+        sample_play()
+        sample_theatre_hall()
+        sample_performance(play_id=1, theatre_hall_id=1)
+
+    def test_reservation_create_is_allowed(self) -> None:
+        data = {"tickets": [{"row": 1, "seat": 1, "performance": 1}]}
+
+        resp = self.client.post(RESERVATION_URL, data=data, format="json")
+
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+
+    def test_reservation_list(self) -> None:
+        for seats in ([1, 2], [3]):
+            data = {
+                "tickets": [
+                    {"row": 1, "seat": seat, "performance": 1}
+                    for seat in seats
+                ]
+            }
+            self.client.post(RESERVATION_URL, data=data, format="json")
+
+        with self.assertNumQueries(3):
+            resp = self.client.get(RESERVATION_URL)
+
+        performance = Performance.objects.select_related(
+            "play", "theatre_hall"
+        ).get(pk=1)
+        expected_performance = {
+            "id": performance.id,
+            "play_title": performance.play.title,
+            "theatre_hall_name": performance.theatre_hall.name,
+            "show_time": "2023-01-01T13:00:00Z",
+            "available_tickets": 147,
+        }
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(resp.data), 2)
+        for reservation, seats in zip(resp.data, ([3], [1, 2])):
+            self.assertEqual(
+                set(reservation), {"id", "created_at", "tickets"}
+            )
+            self.assertEqual(
+                [ticket["seat"] for ticket in reservation["tickets"]], seats
+            )
+            for ticket in reservation["tickets"]:
+                self.assertEqual(
+                    set(ticket), {"id", "row", "seat", "performance"}
+                )
+                self.assertEqual(ticket["performance"], expected_performance)
+
+    def test_reservation_create_with_taken_place(self) -> None:
+        data = {"tickets": [{"row": 1, "seat": 1, "performance": 1}]}
+        self.client.post(RESERVATION_URL, data=data, format="json")
+
+        resp = self.client.post(RESERVATION_URL, data=data, format="json")
+
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_reservation_create_with_duplicate_places(self) -> None:
+        data = {
+            "tickets": [
+                {"row": 1, "seat": 1, "performance": 1},
+                {"row": 1, "seat": 1, "performance": 1},
+            ]
+        }
+
+        resp = self.client.post(RESERVATION_URL, data=data, format="json")
+
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,13 +1,24 @@
 import re
-from typing import Any
+from typing import Any, Iterator
 from collections import OrderedDict
-
-from django.db.models import F, Count, QuerySet
-from django.urls import NoReverseMatch
+from datetime import datetime, time, timedelta
+from functools import lru_cache
+from itertools import islice
+
+from django.core.cache import cache
+from django.db.models import (
+    Exists,
+    Model,
+    OuterRef,
+    QuerySet,
+    prefetch_related_objects,
+)
+from django.http import StreamingHttpResponse
+from django.urls import NoReverseMatch, reverse
+from django.utils import timezone
 from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import views
 from rest_framework import viewsets
-from rest_framework.reverse import reverse
 from rest_framework.generics import get_object_or_404
 from rest_framework.mixins import CreateModelMixin, ListModelMixin
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
@@ -17,6 +28,7 @@ from rest_framework.serializers import BaseSerializer
 from rest_framework_simplejwt.views import status
 from rest_framework.decorators import action
 
+from theatre.cache import get_list_cache_key
 from theatre.models import (
     Actor,
     Genre,
@@ -26,11 +38,12 @@ from theatre.models import (
     TheatreHall,
 )
 from theatre.permissions import IsAdminOrIfAuthenticatedReadOnly, ReadOnly
+from theatre.renderers import ORJSONRenderer
 from theatre.serializers import (
     ActorSerializer,
     GenreSerializer,
     PerformanceDetailSerializer,
-    PerformanceListSerializer,
+    PerformanceListValuesSerializer,
     PerformanceSerializer,
     PlayDetailSerializer,
     PlayImageSerializer,
@@ -43,29 +56,124 @@ from theatre.serializers import (
 from theatre import urls
 
 
-class ActorViewSet(viewsets.ModelViewSet):
+DATE_REGEX = re.compile(r"\d{4}-(0?[1-9]|1[012])-(0?[1-9]|[12][0-9]|3[01])")
+INT_REGEX = re.compile(r"[0-9]+")
+
+
+@lru_cache(maxsize=None)
+def get_root_routes() -> tuple[tuple[str, type, str, tuple], ...]:
+    # built on first use: theatre.urls imports this module, so the router
+    # registry is not populated yet while it is being imported
+    list_name = urls.router.routes[0].name
+    return tuple(
+        (
+            prefix,
+            viewset,
+            list_name.format(basename=basename),
+            tuple(
+                permission_class()
+                for permission_class in viewset.permission_classes
+            ),
+        )
+        for prefix, viewset, basename in urls.router.registry
+    )
+
+
+@lru_cache(maxsize=256)
+def resolve_path(url_name: str, format_suffix: str | None = None) -> str:
+    return reverse(
+        url_name, kwargs={"format": format_suffix} if format_suffix else None
+    )
+
+
+STREAM_PARAMETER = OpenApiParameter(
+    "stream",
+    description=(
+        "Stream the list in batches to limit memory usage. Example: ?stream=1"
+    ),
+    type={"type": "number"},
+)
+
+
+class StreamingListMixin:
+    stream_chunk_size = 1000
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        if request.query_params.get("stream") != "1":
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        return StreamingHttpResponse(
+            self._stream_list(queryset), content_type="application/json"
+        )
+
+    def _stream_list(self, queryset: QuerySet) -> Iterator[bytes]:
+        renderer = ORJSONRenderer()
+        # iterator() ignores prefetch_related before Django 4.1, so the
+        # serializer's lookups are applied to each batch by hand
+        prefetch_lookups = getattr(
+            self.get_serializer_class(), "prefetch_related_lookups", ()
+        )
+        objects = queryset.prefetch_related(None).iterator(
+            chunk_size=self.stream_chunk_size
+        )
+        separator = b"["
+
+        while batch := list(islice(objects, self.stream_chunk_size)):
+            prefetch_related_objects(batch, *prefetch_lookups)
+            data = self.get_serializer(batch, many=True).data
+            yield separator + renderer.render(data)[1:-1]
+            separator = b","
+
+        yield b"[]" if separator == b"[" else b"]"
+
+
+class CachedListMixin:
+    list_cache_timeout = 60 * 15
+    list_cache_models: tuple[type[Model], ...] = ()
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        cache_key = get_list_cache_key(
+            self.basename,
+            self.list_cache_models or (self.queryset.model,),
+            request.build_absolute_uri(),
+        )
+        data = cache.get(cache_key)
+
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set(cache_key, data, self.list_cache_timeout)
+
+        return Response(data)
+
+
+class ActorViewSet(CachedListMixin, viewsets.ModelViewSet):
     queryset = Actor.objects.all()
     serializer_class = ActorSerializer
     permission_classes = (IsAdminUser,)
 
 
-class GenreViewSet(viewsets.ModelViewSet):
+class GenreViewSet(CachedListMixin, viewsets.ModelViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = (IsAdminUser,)
 
 
-class PlayViewSet(viewsets.ModelViewSet):
+class PlayViewSet(
+    StreamingListMixin, CachedListMixin, viewsets.ModelViewSet
+):
     queryset = Play.objects.all()
     serializer_class = PlaySerializer
     permission_classes = (IsAdminUser | ReadOnly,)
+    list_cache_timeout = 30
+    list_cache_models = (Play, Actor, Genre)
 
     @staticmethod
     def _params_to_ints(params: str) -> list[int]:
         return [
             int(object_id)
             for object_id in params.split(",")
-            if object_id.isnumeric()
+            if INT_REGEX.fullmatch(object_id)
         ]
 
     def get_queryset(self) -> QuerySet[Play]:
@@ -76,16 +184,29 @@ class PlayViewSet(viewsets.ModelViewSet):
 
         if actor_params := self.request.query_params.get("actors"):
             actor_ids = self._params_to_ints(actor_params)
-            queryset = queryset.filter(actors__id__in=actor_ids)
+            queryset = queryset.filter(
+                Exists(
+                    Play.actors.through.objects.filter(
+                        play_id=OuterRef("pk"), actor_id__in=actor_ids
+                    )
+                )
+            )
 
         if genre_params := self.request.query_params.get("genres"):
             genre_ids = self._params_to_ints(genre_params)
-            queryset = queryset.filter(genres__id__in=genre_ids)
+            queryset = queryset.filter(
+                Exists(
+                    Play.genres.through.objects.filter(
+                        play_id=OuterRef("pk"), genre_id__in=genre_ids
+                    )
+                )
+            )
 
-        if self.action in ("list", "retrieve"):
-            queryset = queryset.prefetch_related("actors", "genres")
+        serializer_class = self.get_serializer_class()
+        if hasattr(serializer_class, "setup_eager_loading"):
+            queryset = serializer_class.setup_eager_loading(queryset)
 
-        return queryset.distinct()
+        return queryset
 
     def get_serializer_class(self) -> type[BaseSerializer]:
         if self.action == "list":
@@ -113,6 +234,7 @@ class PlayViewSet(viewsets.ModelViewSet):
                 description="Filter plays by actors. Example: ?actors=1,2",
                 type={"type": "list", "items": {"type": "number"}},
             ),
+            STREAM_PARAMETER,
         ]
     )
     def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
@@ -127,47 +249,61 @@ class PlayViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class TheatreHallViewSet(viewsets.ModelViewSet):
+class TheatreHallViewSet(CachedListMixin, viewsets.ModelViewSet):
     queryset = TheatreHall.objects.all()
     serializer_class = TheatreHallSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
 
-class PerformanceViewSet(viewsets.ModelViewSet):
+class PerformanceViewSet(
+    StreamingListMixin, CachedListMixin, viewsets.ModelViewSet
+):
     queryset = Performance.objects.all()
     serializer_class = PerformanceSerializer
     permission_classes = (IsAdminUser | ReadOnly,)
+    list_cache_timeout = 30
+    list_cache_models = (Performance, Play, TheatreHall)
+
+    @staticmethod
+    def _filter_by_date(
+        queryset: QuerySet[Performance], date_str: str
+    ) -> QuerySet[Performance]:
+        try:
+            day = datetime.strptime(date_str, "%Y-%m-%d").date()
+        except ValueError:
+            return queryset
+
+        return queryset.filter(
+            show_time__gte=timezone.make_aware(
+                datetime.combine(day, time.min)
+            ),
+            show_time__lt=timezone.make_aware(
+                datetime.combine(day + timedelta(days=1), time.min)
+            ),
+        )
 
     def get_queryset(self) -> QuerySet[Performance]:
         queryset = self.queryset
 
         if (
             date_str := self.request.query_params.get("date")
-        ) and re.fullmatch(
-            r"^\d{4}\-(0?[1-9]|1[012])\-(0?[1-9]|[12][0-9]|3[01])$", date_str
-        ):
-            queryset = queryset.filter(show_time__date=date_str)
+        ) and DATE_REGEX.fullmatch(date_str):
+            queryset = self._filter_by_date(queryset, date_str)
 
         if (
             play_id := self.request.query_params.get("play")
         ) and play_id.isnumeric():
             queryset = queryset.filter(play_id=play_id)
 
-        if self.action in ("list", "retrieve"):
-            queryset = queryset.select_related("play", "theatre_hall")
+        serializer_class = self.get_serializer_class()
+        if hasattr(serializer_class, "setup_eager_loading"):
+            queryset = serializer_class.setup_eager_loading(queryset)
 
-        if self.action == "list":
-            queryset = queryset.annotate(
-                available_tickets=F("theatre_hall__rows")
-                * F("theatre_hall__seats_in_row")
-                - Count("tickets")
-            )
-
-        return queryset.distinct()
+        return queryset
 
     def get_serializer_class(self) -> type[BaseSerializer]:
         if self.action == "list":
-            return PerformanceListSerializer
+            return PerformanceListValuesSerializer
         elif self.action == "retrieve":
             return PerformanceDetailSerializer
         return self.serializer_class
@@ -187,6 +323,7 @@ class PerformanceViewSet(viewsets.ModelViewSet):
                 description="Filter performances by play id",
                 type={"type": "number"},
             ),
+            STREAM_PARAMETER,
         ]
     )
     def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
@@ -200,14 +337,16 @@ class ReservationViewSet(
     serializer_class = ReservationSerializer
     permission_classes = (IsAuthenticated,)
 
+    def initial(self, request: Request, *args: Any, **kwargs: Any) -> None:
+        super().initial(request, *args, **kwargs)
+        self.user = request.user
+
     def get_queryset(self) -> QuerySet[Reservation]:
-        queryset = self.queryset.filter(user=self.request.user)
+        queryset = self.queryset.filter(user=self.user)
 
-        if self.action == "list":
-            queryset = queryset.prefetch_related(
-                "tickets__performance__play",
-                "tickets__performance__theatre_hall",
-            )
+        serializer_class = self.get_serializer_class()
+        if hasattr(serializer_class, "setup_eager_loading"):
+            queryset = serializer_class.setup_eager_loading(queryset)
 
         return queryset
 
@@ -217,7 +356,7 @@ class ReservationViewSet(
         return self.serializer_class
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        serializer.save(user=self.user)
 
 
 class APIRootView(views.APIView):
@@ -227,6 +366,7 @@ class APIRootView(views.APIView):
 
     _ignore_model_permissions = True
     schema = None
+    _api_root_dict_cache: dict[tuple[str, bool, bool], OrderedDict] = {}
 
     def get(self, request, *args, **kwargs):
         ret = OrderedDict()
@@ -235,12 +375,8 @@ class APIRootView(views.APIView):
             if namespace:
                 url_name = namespace + ":" + url_name
             try:
-                ret[key] = reverse(
-                    url_name,
-                    args=args,
-                    kwargs=kwargs,
-                    request=request,
-                    format=kwargs.get("format"),
+                ret[key] = request.build_absolute_uri(
+                    resolve_path(url_name, kwargs.get("format"))
                 )
             except NoReverseMatch:
                 continue
@@ -248,12 +384,26 @@ class APIRootView(views.APIView):
         return Response(ret)
 
     def get_api_root_dict(self, request):
+        # permission classes only look at the method and the user's
+        # authentication/staff status, so the result is shared between
+        # all requests with the same combination of those
+        signature = (
+            request.method,
+            bool(request.user and request.user.is_authenticated),
+            bool(request.user and request.user.is_staff),
+        )
+        if signature not in self._api_root_dict_cache:
+            self._api_root_dict_cache[signature] = (
+                self._build_api_root_dict(request)
+            )
+        return self._api_root_dict_cache[signature]
+
+    def _build_api_root_dict(self, request):
         api_root_dict = OrderedDict()
-        list_name = urls.router.routes[0].name
-        for prefix, viewset, basename in urls.router.registry:
-            for permission_class in viewset.permission_classes:
-                if not permission_class().has_permission(request, viewset):
-                    break
-            else:
-                api_root_dict[prefix] = list_name.format(basename=basename)
+        for prefix, viewset, url_name, permissions in get_root_routes():
+            if all(
+                permission.has_permission(request, viewset)
+                for permission in permissions
+            ):
+                api_root_dict[prefix] = url_name
         return api_root_dict